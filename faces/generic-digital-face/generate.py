@@ -1,9 +1,15 @@
 # Generate faces list JSON and preview images
 
+import hashlib
 import json
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append("../../tools")
+from convert_snapshot_to_image import convert_snapshot_to_image
+from resize_image import resize_image
 
 _USAGE = """
 Usage:
@@ -11,9 +17,14 @@ Usage:
 
     [micropython executable]    Path of Unix port MicroPython executable.
                                 For example: "~/src/lv_micropython/ports/unix/micropython-dev"
+
+Previews are generated only for faces changed since the last run (see "faces.hashes.json").
+Delete "faces.hashes.json" to regenerate previews of all faces.
 """
 
 _LIST_FILE = "faces.json"
+_HASHES_FILE = "faces.hashes.json"
+_COMPILED_FILES = ("face_compiled.py", "face_compiled.mpy")
 
 _PREVIEW_TIME_TUPLE = str((2023, 1, 1, 12, 0, 0, 0))
 
@@ -21,15 +32,12 @@ _PREVIEWS_DIRECTORY = "_previews"
 _PREVIEW_POSTFIX = "_preview"
 _PREVIEW_EXTENSION = ".jpg"
 
-_PYTHON_COMMAND = "python3"
 _PREVIEW_MPY_FILE = "preview.py"
 
 _SNAPSHOT_EXTENSION = ".raw"
-_SNAPSHOT_CONVERTER = "../../tools/convert_snapshot_to_image.py"
 _SNAPSHOT_WIDTH = 240
 _SNAPSHOT_HEIGHT = 240
 
-_THUMBNAIL_CONVERTER = "../../tools/resize_image.py"
 _THUMBNAIL_WIDTH = 60
 _THUMBNAIL_HEIGHT = 60
 _THUMBNAIL_POSTFIX = "_thumbnail"
@@ -42,6 +50,65 @@ except:
     print(_USAGE)
     sys.exit(1)
 
+
+def get_face_files(name):
+    # Compiled config is generated from face files, and previews are rendered from "face.json", so it is not a face input
+    return sorted(e.path for e in os.scandir(name) if e.is_file() and e.name not in _COMPILED_FILES)
+
+
+def get_face_stat(name):
+    # Fast check of face changes: file names, modification times and sizes
+    stat = []
+    for path in get_face_files(name):
+        st = os.stat(path)
+        stat.append([path, st.st_mtime_ns, st.st_size])
+    return stat
+
+
+def get_face_hash(name):
+    sha = hashlib.sha256()
+    for path in get_face_files(name):
+        sha.update(path.encode())
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def get_file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_hashes():
+    try:
+        with open(_HASHES_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def convert_snapshot(name):
+    print(f"Convert snapshot to preview image: {name}")
+
+    snapshot_path = f"{_PREVIEWS_DIRECTORY}/{name}{_SNAPSHOT_EXTENSION}"
+    preview_path = f"{_PREVIEWS_DIRECTORY}/{name}{_PREVIEW_POSTFIX}{_PREVIEW_EXTENSION}"
+    thumbnail_path = f"{_PREVIEWS_DIRECTORY}/{name}{_THUMBNAIL_POSTFIX}{_THUMBNAIL_EXTENSION}"
+
+    try:
+        # Convert RAW snapshot to image file
+        convert_snapshot_to_image(snapshot_path, preview_path, _SNAPSHOT_WIDTH, _SNAPSHOT_HEIGHT)
+
+        # Create thumbnail image
+        resize_image(preview_path, thumbnail_path, _THUMBNAIL_WIDTH, _THUMBNAIL_HEIGHT)
+
+        # Delete RAW file
+        os.remove(snapshot_path)
+        return True
+    except Exception as e:
+        print(f"Error converting face snapshot to preview image: {snapshot_path}", e)
+        return False
+
+
 face_names = []
 
 # Get list of faces
@@ -74,29 +141,53 @@ for filename in existing_files.difference(keep_files):
     except Exception as e:
         print(f"Error deleting old unused file: {filename}", e)
 
-# Generate faces and take RAW snapshots
-print("Take snapshots of faces")
-subprocess.run([mpy, _PREVIEW_MPY_FILE, "--snapshot-for-all",_SNAPSHOT_EXTENSION, _PREVIEWS_DIRECTORY, _PREVIEW_TIME_TUPLE])
-
-# Convert snapshots to preview image and delete snapshot files
+# Collect faces changed since last run.
+# When preview settings or preview script changed, then all faces have to be regenerated.
+settings = {
+    "preview": get_file_hash(_PREVIEW_MPY_FILE),
+    "time_tuple": _PREVIEW_TIME_TUPLE,
+    "sizes": [_SNAPSHOT_WIDTH, _SNAPSHOT_HEIGHT, _THUMBNAIL_WIDTH, _THUMBNAIL_HEIGHT]
+}
+hashes = load_hashes()
+previous_faces = hashes.get("faces", {}) if hashes.get("settings", None) == settings else {}
+faces_hashes = {}
+changed_face_names = []
 for name in face_names:
-    print(f"Convert snapshot to preview image: {name}")
+    previous = previous_faces.get(name, None)
+    stat = get_face_stat(name)
+    outputs_exist = all(os.path.isfile(f"{_PREVIEWS_DIRECTORY}/{file}") for file in (
+        f"{name}{_PREVIEW_POSTFIX}{_PREVIEW_EXTENSION}",
+        f"{name}{_THUMBNAIL_POSTFIX}{_THUMBNAIL_EXTENSION}"))
 
-    snapshot_path = f"{_PREVIEWS_DIRECTORY}/{name}{_SNAPSHOT_EXTENSION}"
-    preview_path = f"{_PREVIEWS_DIRECTORY}/{name}{_PREVIEW_POSTFIX}{_PREVIEW_EXTENSION}"
-    thumbnail_path = f"{_PREVIEWS_DIRECTORY}/{name}{_THUMBNAIL_POSTFIX}{_THUMBNAIL_EXTENSION}"
+    if previous and outputs_exist and previous["stat"] == stat:
+        faces_hashes[name] = previous
+        continue
 
-    try:
-        # Convert RAW snapshot to image file
-        subprocess.run([_PYTHON_COMMAND, _SNAPSHOT_CONVERTER, snapshot_path, preview_path, str(_SNAPSHOT_WIDTH), str(_SNAPSHOT_HEIGHT)])
+    # Hash face files only when fast check detected a change
+    face_hash = get_face_hash(name)
+    faces_hashes[name] = {"stat": stat, "sha256": face_hash}
+    if not previous or not outputs_exist or previous["sha256"] != face_hash:
+        changed_face_names.append(name)
 
-        # Create thumbnail image
-        subprocess.run([_PYTHON_COMMAND, _THUMBNAIL_CONVERTER, preview_path, thumbnail_path, str(_THUMBNAIL_WIDTH), str(_THUMBNAIL_HEIGHT)])
+print(f"Faces count: {len(face_names)}, changed: {len(changed_face_names)}")
 
-        # Delete RAW file
-        os.remove(snapshot_path)
-    except Exception as e:
-        print(f"Error converting face snapshot to preview image: {snapshot_path}", e)
+# Generate faces and take RAW snapshots
+if changed_face_names:
+    print("Take snapshots of faces")
+    subprocess.run([mpy, _PREVIEW_MPY_FILE, "--snapshot-for-all", _SNAPSHOT_EXTENSION, _PREVIEWS_DIRECTORY, _PREVIEW_TIME_TUPLE, *changed_face_names])
+
+# Convert snapshots to preview image and delete snapshot files.
+# Faces are independent, and Pillow releases the GIL while decoding, resizing and encoding images,
+# so threads are enough to run conversions in parallel.
+with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+    for name, converted in zip(changed_face_names, executor.map(convert_snapshot, changed_face_names)):
+        # Failed faces are retried on next run
+        if not converted:
+            del faces_hashes[name]
+
+# Save hashes of generated faces
+with open(_HASHES_FILE, "w") as f:
+    json.dump({"settings": settings, "faces": faces_hashes}, f)
 
 # Save faces list JSON
 with open(_LIST_FILE, "w") as f:
@@ -5,9 +5,9 @@ import os
 import gc
 import json
 import errno
-import struct
 import sys
 import uasyncio
+import micropython
 import lvgl as lv
 
 from micropython import const
@@ -21,7 +21,7 @@ Usage:
     $mp preview.py [face name] 
     $mp preview.py [face name] [snapshot file] [time tuple]
     $mp preview.py --help
-    $mp preview.py --snapshot-for-all [snapshot name postfix] [snapshots path] [time tuple] 
+    $mp preview.py --snapshot-for-all [snapshot name postfix] [snapshots path] [time tuple] [face names]
 
     [face name]                 Preview given face. (Optional)
     [snapshot file]             Take snapshot of face preview and save as RAW file. (Optional)
@@ -29,25 +29,37 @@ Usage:
 
     --help                      Show current usage help
 
-    --snapshot-for-all          Take snapshot RAW files for all faces
+    --snapshot-for-all          Take snapshot RAW files for all faces (or for the given faces)
     [snapshot name postfix]     Snapshot file postfix (example: "_preview.raw") (Required)
     [snapshots path]            Path to store snapshot RAW files (example: _previews) (Required)
     [time tuple]                Show given time instead of actaul time. Tuple: (YYYY, MM, DD, HH, mm, ss, weekday) (Required)
+    [face names]                Space separated list of faces to take snapshot of (Optional)
 
 Snapshot files are generated as BGRA RAW images.
 They can be converted to PNG/JPEG/WebP image format with the script: "[repo]/tools/convert_snapshot_to_image.py"
+
+Faces compiled with the script "[repo]/tools/compile_face.py" are loaded from "face_compiled.py" instead of "face.json",
+unless "face.json" was changed after compiling.
+Importing "face_compiled.py" source is not faster than parsing JSON, as MicroPython compiles the module first:
+to load faster, convert it with "mpy-cross" to "face_compiled.mpy" and delete "face_compiled.py",
+as MicroPython imports ".py" source when both files exist.
+Snapshots are always taken from "face.json".
 """
 
 _FACE_FILE = "face.json"
+_FACE_COMPILED_MODULE = "face_compiled"
 _WIDTH = const(240)
 _HEIGHT = const(240)
 _MARGIN_PERCENT = const(20)
 _DRIVE_LETTER = const('S')
-_FS_CACHE_SIZE = const(2048)
+_FS_CACHE_SIZE = const(8192)
 _IMG_CACHE_COUNT = const(32)
+_FONT_CACHE_COUNT = const(8)
 
 _TYPE_DIRECTORY = const(0x4000)
 
+_IDLE_PERIOD_MS = const(86400000)
+
 _MENU_ITEM_WIDTH = const(200)
 _MENU_ITEM_HEIGHT = const(50)
 
@@ -57,83 +69,281 @@ _MENU_ITEM_HEIGHT = const(50)
 # ************************************
 _FONTS_PATH = _DRIVE_LETTER + ":fonts/"
 
-_WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-_WEEK_DAYS_SHORT = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+_WEEK_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_WEEK_DAYS_SHORT = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
 
-_MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
-_MONTHS_SHORT = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+_MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December")
+_MONTHS_SHORT = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
 
 _BATTERY_PERCENT = const(100)
 
+# Zero padded two digit numbers, so formatting time fields does not allocate new strings
+_TWO_DIGITS = tuple([f"{i:02d}" for i in range(100)])
+
+_PART_MAIN = lv.PART.MAIN
+_STATE_DEFAULT = lv.STATE.DEFAULT
+
+_DEFAULT_ALIGN = lv.ALIGN.TOP_LEFT
+_DEFAULT_TEXTALIGN = lv.TEXT_ALIGN.LEFT
+
+# All alignment names defined by LVGL, resolved once
+_ALIGN_MAP = {name: value for name, value in lv.ALIGN.__dict__.items() if not name.startswith("_")}
+_TEXTALIGN_MAP = {name: value for name, value in lv.TEXT_ALIGN.__dict__.items() if not name.startswith("_")}
+
+# Time tuple fields
+_TT_YEAR = const(0)
+_TT_MONTH = const(1)
+_TT_DAY = const(2)
+_TT_HOUR = const(3)
+_TT_MINUTE = const(4)
+_TT_SECOND = const(5)
+_TT_WEEKDAY = const(6)
+
+# Bit N of a label dependency mask is set, when label depends on field N of time tuple
+_TIME_TUPLE_FIELDS = const(7)
+
+# Placeholder: (dependency mask, transform callback)
+# Battery level is constant in preview, so it has no dependency and it is rendered only once
 _PLACEHOLDERS = {
-    "{YYYY}": lambda time_tuple: f"{time_tuple[0]:04d}",
-    "{MM}": lambda time_tuple: f"{time_tuple[1]:02d}",
-    "{DD}": lambda time_tuple: f"{time_tuple[2]:02d}",
-    "{HH}": lambda time_tuple: f"{time_tuple[3]:02d}",
-    "{mm}": lambda time_tuple: f"{time_tuple[4]:02d}",
-    "{ss}": lambda time_tuple: f"{time_tuple[5]:02d}",
-    "{day}": lambda time_tuple: _WEEK_DAYS[time_tuple[6]],
-    "{day_short}": lambda time_tuple: _WEEK_DAYS_SHORT[time_tuple[6]],
-    "{month}": lambda time_tuple: _MONTHS[time_tuple[1] - 1],
-    "{month_short}": lambda time_tuple: _MONTHS_SHORT[time_tuple[1] - 1],
-    "{battery_percent}": lambda time_tuple: str(_BATTERY_PERCENT)
+    "{YYYY}": (1 << _TT_YEAR, lambda time_tuple: f"{time_tuple[_TT_YEAR]:04d}"),
+    "{MM}": (1 << _TT_MONTH, lambda time_tuple: _TWO_DIGITS[time_tuple[_TT_MONTH]]),
+    "{DD}": (1 << _TT_DAY, lambda time_tuple: _TWO_DIGITS[time_tuple[_TT_DAY]]),
+    "{HH}": (1 << _TT_HOUR, lambda time_tuple: _TWO_DIGITS[time_tuple[_TT_HOUR]]),
+    "{mm}": (1 << _TT_MINUTE, lambda time_tuple: _TWO_DIGITS[time_tuple[_TT_MINUTE]]),
+    "{ss}": (1 << _TT_SECOND, lambda time_tuple: _TWO_DIGITS[time_tuple[_TT_SECOND]]),
+    "{day}": (1 << _TT_WEEKDAY, lambda time_tuple: _WEEK_DAYS[time_tuple[_TT_WEEKDAY]]),
+    "{day_short}": (1 << _TT_WEEKDAY, lambda time_tuple: _WEEK_DAYS_SHORT[time_tuple[_TT_WEEKDAY]]),
+    "{month}": (1 << _TT_MONTH, lambda time_tuple: _MONTHS[time_tuple[_TT_MONTH] - 1]),
+    "{month_short}": (1 << _TT_MONTH, lambda time_tuple: _MONTHS_SHORT[time_tuple[_TT_MONTH] - 1]),
+    "{battery_percent}": (0, lambda time_tuple: str(_BATTERY_PERCENT))
 }
 
+# (dependency mask, update period): each period is a multiple of all smaller ones,
+# so the smallest period of the dependencies is the common tick period as well
+_DEPENDENCY_PERIODS_MS = (
+    (1 << _TT_SECOND, 1000),
+    (1 << _TT_MINUTE, 60000),
+    (1 << _TT_HOUR, 3600000),
+    ((1 << _TT_YEAR) | (1 << _TT_MONTH) | (1 << _TT_DAY) | (1 << _TT_WEEKDAY), 86400000)
+)
+
+
+@micropython.native
+def _get_changed_fields(time_tuple, last_time_tuple):
+    # Mask of time tuple fields changed since last update (all fields, if there was no update yet)
+    if not last_time_tuple:
+        return -1
+
+    changed = 0
+    for i in range(_TIME_TUPLE_FIELDS):
+        if time_tuple[i] != last_time_tuple[i]:
+            changed |= 1 << i
+    return changed
+
+
+@micropython.native
+def _update_labels_native(lv_labels, plans, deps, values, placeholder_keys, placeholder_values, time_tuple, changed):
+    __placeholders = _PLACEHOLDERS
+
+    # Format only placeholders used by face labels, and depending on changed fields
+    for key in placeholder_keys:
+        placeholder = __placeholders[key]
+        if placeholder[0] & changed or key not in placeholder_values:
+            placeholder_values[key] = placeholder[1](time_tuple)
+
+    # Render texts of changed labels first, then apply them in one batch,
+    # so LVGL invalidates all changed areas together before next refresh
+    __get_value = placeholder_values.get
+    changed_indexes = []
+    for i in range(len(plans)):
+        # Skip labels already rendered, and not depending on changed fields.
+        # Every placeholder maps distinct field values to distinct texts,
+        # so a label depending on a changed field always gets a new text, no need to compare strings.
+        if values[i] is not None and not deps[i] & changed:
+            continue
+
+        values[i] = "".join([__get_value(seg, seg) for seg in plans[i]])
+        changed_indexes.append(i)
+
+    for i in changed_indexes:
+        lv_labels[i].set_text(values[i])
+
+
+class FontCache:
+    # Fonts kept loaded across faces, freed only when no label uses them and cache is over its limit
+    def __init__(self, max_count):
+        self._max_count = max_count
+        self._fonts = {}
+        self._refs = {}
+        # Not referenced font names, in least recently used order
+        self._unused = []
+
+    def acquire(self, font_name):
+        font = self._fonts.get(font_name, None)
+        if font:
+            refs = self._refs[font_name]
+            if not refs:
+                self._unused.remove(font_name)
+        else:
+            font = lv.font_load(font_name)
+            if not font:
+                return None
+            self._fonts[font_name] = font
+            refs = 0
+
+        self._refs[font_name] = refs + 1
+        return font
+
+    def release(self, font_name):
+        refs = self._refs[font_name] - 1
+        self._refs[font_name] = refs
+        if refs:
+            return
+
+        self._unused.append(font_name)
+        while len(self._fonts) > self._max_count and self._unused:
+            name = self._unused.pop(0)
+            del self._refs[name]
+            font = self._fonts.pop(name)
+            font.free()
+            del font
+
 
 class Face:
-    def __init__(self, screen, base_path, name):
+    # Background image data of shown face, reused (and only grown) across faces
+    _image_buffer = None
+    # LVGL colors by integer value, shared by all faces
+    _colors = {}
+
+    def __init__(self, screen, base_path, font_cache):
         self._screen = screen
         self._base_path = base_path
-        self._name = name
+        self._name = None
+        self._use_compiled_config = True
+        self._font_cache = font_cache
+        self._font_names = []
         self._container = self._screen
-        self._labels = []
-        self._fonts = {}
+        # Dynamic labels, as parallel lists: LVGL label, text plan, dependency mask, current text
+        self._lv_labels = []
+        self._plans = []
+        self._deps = []
+        self._values = []
+        self._last_time_tuple = None
+        self._placeholder_keys = set()
+        self._placeholder_values = {}
+        self.period_ms = 0
 
     def show(self, time_tuple = None):
         try:
             face_path = f"{self._base_path}/{self._name}"
-            with open(f"{face_path}/{_FACE_FILE}", "r") as f:
-                face_config = json.load(f)
+            face_config = self._load_config(face_path) if self._use_compiled_config else self._load_json_config(face_path)
 
             if face_config["version"] != "1":
                 print(f"Unknown face config version: {face_config['version']}")
                 return
 
-            self._load_background(face_config, face_path)
-            self._load_labels(face_config)
+            # Keep only needed sections, so the rest of config can be freed right away
+            background_config = face_config.get("background", None)
+            labels_config = face_config.get("labels", None)
+            face_config = None
+
+            if background_config:
+                self._load_background(background_config, face_path)
+                background_config = None
+            if labels_config:
+                self._load_labels(labels_config)
+                labels_config = None
+            gc.collect()
+
+            # Collect garbage after each quarter of free heap is allocated:
+            # more frequent, but short collections instead of a long one when heap runs out
+            gc.threshold(gc.mem_free() // 4)
             self._update_labels(time_tuple)
         except Exception as e:
             print(f"Failed to load face: {self._name}", e)
 
+    def reload(self, name, time_tuple = None, use_compiled_config = True):
+        # Show another face, keeping caches of this instance
+        if self._name:
+            self.dispose()
+        self._name = name
+        self._use_compiled_config = use_compiled_config
+        self.show(time_tuple)
+
+    def update(self):
+        self._update_labels()
+
     def dispose(self):
+        self._name = None
         self._screen.clean()
-        self._labels.clear()
-        for font in self._fonts.values():
-            font.free()
-            del font
-        self._fonts.clear()
+        self._container = self._screen
+        self._lv_labels.clear()
+        self._plans.clear()
+        self._deps.clear()
+        self._values.clear()
+        for font_name in self._font_names:
+            self._font_cache.release(font_name)
+        self._font_names.clear()
+        self._last_time_tuple = None
+        self._placeholder_keys.clear()
+        self._placeholder_values.clear()
+        self.period_ms = 0
 
         lv.img.cache_invalidate_src(None)
         gc.collect()
 
-    def _load_background(self, face_config, face_path):
-        if "background" not in face_config:
-            return
+    def _load_config(self, face_path):
+        # Prefer compiled config module, when it was compiled after last change of JSON config.
+        # Modification times have whole second resolution, so JSON config wins on a tie.
+        # Importer loads ".py" source when it exists, so ".mpy" is checked only without it.
+        json_path = f"{face_path}/{_FACE_FILE}"
+        compiled_mtime = self._get_mtime(f"{face_path}/{_FACE_COMPILED_MODULE}.py")
+        if compiled_mtime < 0:
+            compiled_mtime = self._get_mtime(f"{face_path}/{_FACE_COMPILED_MODULE}.mpy")
+        if compiled_mtime > self._get_mtime(json_path):
+            sys.path.insert(0, face_path)
+            try:
+                return __import__(_FACE_COMPILED_MODULE).CONFIG
+            except ImportError:
+                pass
+            finally:
+                sys.path.pop(0)
+                sys.modules.pop(_FACE_COMPILED_MODULE, None)
 
-        cfg = face_config["background"]
+        return self._load_json_config(face_path)
+
+    def _load_json_config(self, face_path):
+        with open(f"{face_path}/{_FACE_FILE}", "r") as f:
+            return json.load(f)
+
+    def _get_mtime(self, path):
+        try:
+            return os.stat(path)[8]
+        except OSError:
+            return -1
+
+    def _load_background(self, cfg, face_path):
         if "color" in cfg:
             color = self._hex_color(cfg.get("color"))
-            self._screen.set_style_bg_color(color, lv.STATE.DEFAULT)
+            self._screen.set_style_bg_color(color, _STATE_DEFAULT)
 
         if "image" in cfg:
             image_path = f"{face_path}/{cfg.get('image')}"
             try:
+                size = os.stat(image_path)[6]
+                image_buffer = Face._image_buffer
+                if image_buffer is None or len(image_buffer) < size:
+                    # Release smaller buffer before allocating the new one
+                    Face._image_buffer = image_buffer = None
+                    image_buffer = bytearray(size)
+                    Face._image_buffer = image_buffer
+
                 with open(image_path, "rb") as f:
-                    image_data = f.read()
+                    f.readinto(memoryview(image_buffer)[:size])
 
                 image_desc = lv.img_dsc_t({
-                    "data_size": len(image_data),
-                    "data": image_data
+                    "data_size": size,
+                    "data": image_buffer
                 })
 
                 image = lv.img(self._screen)
@@ -143,74 +353,111 @@ class Face:
             except:
                 print(f"Failed to background image: {image_path}")
 
-    def _load_labels(self, face_config):
-        if "labels" not in face_config:
-            return
-
-        __part_main = lv.PART.MAIN
-        __default_align = lv.ALIGN.TOP_LEFT
-        __default_textalign = lv.TEXT_ALIGN.LEFT
-        __hex_to_color = self._hex_color
-        __create_label = lv.label
-        __lv_align = lv.ALIGN
-        __lv_textalign = lv.TEXT_ALIGN
-        __font_load = lv.font_load
-        __labels = face_config["labels"]
-
-        for cfg in __labels:
-            __cfg_get = cfg.get
-            text = __cfg_get("text", "")
-            color = __hex_to_color(__cfg_get("color", "#000"))
-            font_name = __cfg_get("font", None)
-            x = __cfg_get("x", 0)
-            y = __cfg_get("y", 0)
-            
-            align_text = __cfg_get("align", None)
-            align = __lv_align.__dict__.get(align_text, __default_align)
-
-            align_text = __cfg_get("textalign", None)
-            textalign = __lv_textalign.__dict__.get(align_text, __default_textalign)
-
-            label = __create_label(self._container)
-            label.set_style_text_color(color, __part_main)
-            label.set_style_text_align(textalign, __part_main)
-            label.set_recolor(True)
-            label.align(align, x, y)
-            label.set_text("")
-
-            if font_name:
-                font_name = _FONTS_PATH + font_name
-                try:
-                    font = self._fonts.get(font_name, None)
-                    if not font:
-                        font = __font_load(font_name)
-                        self._fonts[font_name] = font
-                    label.set_style_text_font(font, __part_main)
-                except Exception as e:
-                    print(f"Failed to load font: {font_name}", e)
-
-            self._labels.append({
-                "lv_label": label,
-                "text": text,
-                "value": ""
-            })
+    def _load_labels(self, labels_config):
+        __load_one_label = self._load_one_label
+        face_deps = 0
+
+        for i in range(len(labels_config)):
+            face_deps |= __load_one_label(labels_config[i])
+            # Release label config as soon as it is loaded
+            labels_config[i] = None
+
+        # Update period required by the fastest changing placeholder
+        for mask, period_ms in _DEPENDENCY_PERIODS_MS:
+            if face_deps & mask:
+                self.period_ms = period_ms
+                break
+
+    def _load_one_label(self, cfg):
+        __part_main = _PART_MAIN
+        __cfg_get = cfg.get
+        text = __cfg_get("text", "")
+        color = self._hex_color(__cfg_get("color", "#000"))
+        font_name = __cfg_get("font", None)
+        x = __cfg_get("x", 0)
+        y = __cfg_get("y", 0)
+
+        align_text = __cfg_get("align", None)
+        align = _ALIGN_MAP.get(align_text, _DEFAULT_ALIGN)
+
+        align_text = __cfg_get("textalign", None)
+        textalign = _TEXTALIGN_MAP.get(align_text, _DEFAULT_TEXTALIGN)
+
+        label = lv.label(self._container)
+        label.set_style_text_color(color, __part_main)
+        label.set_style_text_align(textalign, __part_main)
+        label.set_recolor(True)
+        label.align(align, x, y)
+
+        if font_name:
+            font_name = _FONTS_PATH + font_name
+            try:
+                font = self._font_cache.acquire(font_name)
+                if font:
+                    self._font_names.append(font_name)
+                label.set_style_text_font(font, __part_main)
+            except Exception as e:
+                print(f"Failed to load font: {font_name}", e)
+
+        # Static labels (without placeholders) get their text only once, and are never updated
+        plan, deps = self._compile_text(text)
+        if not any(seg in _PLACEHOLDERS for seg in plan):
+            label.set_text(text)
+            return 0
+
+        label.set_text("")
+        self._lv_labels.append(label)
+        self._plans.append(plan)
+        self._deps.append(deps)
+        self._values.append(None)
+        return deps
 
     def _hex_color(self, value):
-        color_int = int(value.lstrip("#"), 16)
-        return lv.color_hex(color_int)
+        # Colors of compiled configs are already integers
+        color_int = value if isinstance(value, int) else int(value.lstrip("#"), 16)
+        color = Face._colors.get(color_int, None)
+        if color is None:
+            color = lv.color_hex(color_int)
+            Face._colors[color_int] = color
+        return color
+
+    def _compile_text(self, text):
+        # Split label text into a plan of literal strings and placeholder keys,
+        # and collect dependency mask of the placeholders found.
+        # A literal never equals a placeholder key, as it would have been parsed as placeholder.
+        plan = []
+        deps = 0
+        literal_start = 0
+        start = text.find("{")
+        while start >= 0:
+            end = text.find("}", start)
+            if end < 0:
+                break
+
+            key = text[start:end + 1]
+            placeholder = _PLACEHOLDERS.get(key, None)
+            if placeholder:
+                if start > literal_start:
+                    plan.append(text[literal_start:start])
+                plan.append(key)
+                self._placeholder_keys.add(key)
+                deps |= placeholder[0]
+                literal_start = end + 1
+                start = text.find("{", literal_start)
+            else:
+                start = text.find("{", start + 1)
+
+        if literal_start < len(text):
+            plan.append(text[literal_start:])
+
+        return plan, deps
 
     def _update_labels(self, time_tuple = None):
         time_tuple = time_tuple or time.localtime()
-        for label in self._labels:
-            text = label["text"]
-
-            for key, transform_cb in _PLACEHOLDERS.items():
-                if key in text:
-                    text = text.replace(key, transform_cb(time_tuple))
-
-            if text != label["value"]:
-                label["value"] = text
-                label["lv_label"].set_text(text)
+        changed = _get_changed_fields(time_tuple, self._last_time_tuple)
+        self._last_time_tuple = time_tuple
+        _update_labels_native(self._lv_labels, self._plans, self._deps, self._values,
+                              self._placeholder_keys, self._placeholder_values, time_tuple, changed)
 
 
 # ************************************
@@ -220,6 +467,15 @@ _RET_OK = lv.FS_RES.OK
 _RET_FS_ERR = lv.FS_RES.FS_ERR
 
 
+@micropython.viper
+def _store_uint32(buf: ptr8, value: int):
+    # Store unsigned 32-bit integer as little-endian bytes, without allocating a packed bytes object
+    buf[0] = value & 0xFF
+    buf[1] = (value >> 8) & 0xFF
+    buf[2] = (value >> 16) & 0xFF
+    buf[3] = (value >> 24) & 0xFF
+
+
 class LVGL_FS_File:
     def __init__(self, file, path):
         self.file = file
@@ -260,54 +516,60 @@ class LVGL_FS_Driver():
 
         return LVGL_FS_File(f, path)
 
-    def close_cb(self, drv, fs_file):
+    # Result codes are bound as default arguments, so they are read as locals in callbacks
+    def close_cb(self, drv, fs_file, _ok=_RET_OK, _err=_RET_FS_ERR):
+        f = fs_file.__cast__()
         try:
-            fs_file.__cast__().file.close()
+            f.file.close()
         except Exception as e:
-            print(f"close_cb('{fs_file.__cast__().path}') error: {errno.errorcode[e.args[0]]}", e)
-            return _RET_FS_ERR
+            print(f"close_cb('{f.path}') error: {errno.errorcode[e.args[0]]}", e)
+            return _err
 
-        return _RET_OK
+        return _ok
 
-    def read_cb(self, drv, fs_file, buf, btr, br):
+    def read_cb(self, drv, fs_file, buf, btr, br, _ok=_RET_OK, _err=_RET_FS_ERR):
+        f = fs_file.__cast__()
         try:
             tmp_data = buf.__dereference__(btr)
-            bytes_read = fs_file.__cast__().file.readinto(tmp_data)
-            br.__dereference__(4)[0:4] = struct.pack("<L", bytes_read)
+            bytes_read = f.file.readinto(tmp_data)
+            _store_uint32(br.__dereference__(4), bytes_read)
         except Exception as e:
-            print(f"read_cb('{fs_file.__cast__().path}', {btr}) error: {errno.errorcode[e.args[0]]}", e)
-            return _RET_FS_ERR
+            print(f"read_cb('{f.path}', {btr}) error: {errno.errorcode[e.args[0]]}", e)
+            return _err
 
-        return _RET_OK
+        return _ok
 
-    def seek_cb(self, drv, fs_file, pos, whence):
+    def seek_cb(self, drv, fs_file, pos, whence, _ok=_RET_OK, _err=_RET_FS_ERR):
+        f = fs_file.__cast__()
         try:
-            fs_file.__cast__().file.seek(pos, whence)
+            f.file.seek(pos, whence)
         except Exception as e:
-            print(f"seek_cb('{fs_file.__cast__().path}', {pos}, {whence}) error: {errno.errorcode[e.args[0]]}", e)
-            return _RET_FS_ERR
+            print(f"seek_cb('{f.path}', {pos}, {whence}) error: {errno.errorcode[e.args[0]]}", e)
+            return _err
 
-        return _RET_OK
+        return _ok
 
-    def tell_cb(self, drv, fs_file, pos):
+    def tell_cb(self, drv, fs_file, pos, _ok=_RET_OK, _err=_RET_FS_ERR):
+        f = fs_file.__cast__()
         try:
-            tpos = fs_file.__cast__().file.tell()
-            pos.__dereference__(4)[0:4] = struct.pack("<L", tpos)
+            tpos = f.file.tell()
+            _store_uint32(pos.__dereference__(4), tpos)
         except Exception as e:
-            print(f"tell_cb('{fs_file.__cast__().path}') error: {errno.errorcode[e.args[0]]}", e)
-            return _RET_FS_ERR
+            print(f"tell_cb('{f.path}') error: {errno.errorcode[e.args[0]]}", e)
+            return _err
 
-        return _RET_OK
+        return _ok
 
-    def write_cb(self, drv, fs_file, buf, btw, bw):
+    def write_cb(self, drv, fs_file, buf, btw, bw, _ok=_RET_OK, _err=_RET_FS_ERR):
+        f = fs_file.__cast__()
         try:
-            wr = fs_file.__cast__().file.write(buf[0:btw])
-            bw.__dereference__(4)[0:4] = struct.pack("<L", wr)
+            wr = f.file.write(buf[0:btw])
+            _store_uint32(bw.__dereference__(4), wr)
         except Exception as e:
-            print(f"write_cb('{fs_file.__cast__().path}', {btw}) error: {errno.errorcode[e.args[0]]}", e)
-            return _RET_FS_ERR
+            print(f"write_cb('{f.path}', {btw}) error: {errno.errorcode[e.args[0]]}", e)
+            return _err
 
-        return _RET_OK
+        return _ok
 
 # ************************************
 # Main app
@@ -319,11 +581,16 @@ class App():
         self._faces_path = os.getcwd()
         self._root_path = self._faces_path.rsplit("/", 2)[0]
         self._face: Face = None
+        self._is_face_shown = False
+        self._font_cache = FontCache(_FONT_CACHE_COUNT)
         self._faces = []
+        self._face_indexes = {}
+        self._face_index = 0
         self._menu_screen: lv.obj = None
         self._face_screen: lv.obj = None
         self._face_selector_dropdown: lv.dropdown = None
         self._is_running = False
+        self._wake_event = uasyncio.Event()
 
         self._load_faces_list()
         self._init_lvgl()
@@ -333,17 +600,36 @@ class App():
         self._init_face_screen()
 
     async def loop(self, face_name=None):
-        if face_name and face_name in self._faces and self._path_exists(f"{self._faces_path}/{face_name}"):
-            self._face_selector_dropdown.set_selected(self._faces.index(face_name))
+        index = self._face_indexes.get(face_name, None)
+        if index is not None and self._path_exists(f"{self._faces_path}/{face_name}"):
+            self._select_face(index)
             self._show_face(face_name)
         else:
             self._show_menu()
         self._is_running = True
         while self._is_running:
-            await uasyncio.sleep_ms(200)
+            # Sleep until next update of current face, or until woken up by UI events
+            try:
+                await uasyncio.wait_for_ms(self._wake_event.wait(), self._next_delay_ms())
+            except uasyncio.TimeoutError:
+                if self._is_face_shown:
+                    self._face.update()
+            self._wake_event.clear()
+
+    def _next_delay_ms(self):
+        period_ms = self._face.period_ms if self._is_face_shown else 0
+        if not period_ms:
+            return _IDLE_PERIOD_MS
+
+        # Align to local wall clock boundaries of the period, as labels are rendered from local time
+        now_ns = time.time_ns()
+        time_tuple = time.localtime(now_ns // 1000000000)
+        elapsed_ms = ((time_tuple[_TT_HOUR] * 60 + time_tuple[_TT_MINUTE]) * 60 + time_tuple[_TT_SECOND]) * 1000
+        elapsed_ms += (now_ns // 1000000) % 1000
+        return period_ms - elapsed_ms % period_ms
     
-    def snapshot_all(self, snapshot_name_postfix, snapshots_path, time_tuple):
-        for face_name in self._faces:
+    def snapshot_all(self, snapshot_name_postfix, snapshots_path, time_tuple, face_names=None):
+        for face_name in face_names or self._faces:
             snapshot_file_name = f"{snapshots_path}/{face_name}{snapshot_name_postfix}"
             self.snapshot(face_name, snapshot_file_name, time_tuple)
             gc.collect()
@@ -354,7 +640,8 @@ class App():
             return
         
         self._face_screen.clean()
-        self._show_face(face_name, time_tuple)
+        # Snapshots are previews of "face.json", the config loaded by the watch
+        self._show_face(face_name, time_tuple, False)
         snapshot = lv.snapshot_take(self._face_screen, lv.img.CF.TRUE_COLOR_ALPHA)
         size = self._face_screen.get_width() * self._face_screen.get_height() * 4
         data = snapshot.data.__dereference__(size)
@@ -362,7 +649,7 @@ class App():
             f.write(data)
 
         lv.snapshot_free(snapshot)
-        self._face.dispose()
+        self._hide_face()
         print(f"Snapshot file: {snapshot_file_name} ({size} bytes)")
 
     def _init_lvgl(self):
@@ -420,7 +707,7 @@ class App():
         screen.set_style_pad_ver(10, 0)
         screen.set_flex_flow(lv.FLEX_FLOW.COLUMN)
         screen.set_flex_align(lv.FLEX_ALIGN.START, lv.FLEX_ALIGN.CENTER, lv.FLEX_ALIGN.CENTER)
-        screen.set_style_pad_row(10, lv.STATE.DEFAULT)
+        screen.set_style_pad_row(10, _STATE_DEFAULT)
 
         # Faces dropdown
         dd = lv.dropdown(screen)
@@ -459,36 +746,47 @@ class App():
         self._face_screen.add_event_cb(self._face_screen_click_cb, lv.EVENT.CLICKED, None)
     
     def _load_faces_list(self):
-        faces = [entry[0] for entry in os.ilistdir(self._faces_path) if entry[1] == _TYPE_DIRECTORY and not entry[0].startswith("_")]
-        faces.sort()
+        # Cheaper name check goes first, and entries are unpacked instead of indexed
+        faces = sorted(name for name, entry_type, *_ in os.ilistdir(self._faces_path) if name[0] != "_" and entry_type == _TYPE_DIRECTORY)
         self._faces = faces
+        self._face_indexes = {name: index for index, name in enumerate(faces)}
+
+    def _select_face(self, index):
+        self._face_index = index
+        self._face_selector_dropdown.set_selected(index)
 
     def _show_button_cb(self, event):
-        face_name = self._faces[self._face_selector_dropdown.get_selected()]
-        self._show_face(face_name)
+        self._face_index = self._face_selector_dropdown.get_selected()
+        self._show_face(self._faces[self._face_index])
     
     def _reload_button_cb(self, event):
         current_face_name = self._faces[self._face_selector_dropdown.get_selected()]
         self._load_faces_list()
         self._face_selector_dropdown.set_options("\n".join(self._faces))
-        if current_face_name in self._faces:
-            self._face_selector_dropdown.set_selected(self._faces.index(current_face_name))
+        self._select_face(self._face_indexes.get(current_face_name, 0))
 
     def _exit_button_cb(self, event):
         self._is_running = False
+        self._wake_event.set()
 
     def _show_menu(self):
         lv.scr_load(self._menu_screen)
 
-    def _show_face(self, name, time_tuple = None):
+    def _show_face(self, name, time_tuple = None, use_compiled_config = True):
         lv.scr_load(self._face_screen)
-        self._face = Face(self._face_screen, self._faces_path, name)
-        self._face.show(time_tuple)
+        if not self._face:
+            self._face = Face(self._face_screen, self._faces_path, self._font_cache)
+        self._face.reload(name, time_tuple, use_compiled_config)
+        self._is_face_shown = True
+        self._wake_event.set()
+
+    def _hide_face(self):
+        if self._is_face_shown:
+            self._face.dispose()
+        self._is_face_shown = False
 
     def _face_screen_click_cb(self, event):
-        if self._face:
-            self._face.dispose()
-        self._face = None
+        self._hide_face()
 
         # If left or right side is touched, then show previous/next face
         show_other_face = False
@@ -496,7 +794,7 @@ class App():
         m = int(w * _MARGIN_PERCENT / 100)
         p = lv.point_t()
         event.get_indev().get_point(p)
-        index = self._face_selector_dropdown.get_selected()
+        index = self._face_index
         if p.x < m:
             index = max(0, index - 1)
             show_other_face = True
@@ -505,7 +803,7 @@ class App():
             show_other_face = True
 
         if show_other_face:
-            self._face_selector_dropdown.set_selected(index)
+            self._select_face(index)
             self._show_face(self._faces[index])
         else:
             self._show_menu()
@@ -543,12 +841,13 @@ if arg1 == "--snapshot-for-all":
     try:
         snapshot_name_postfix = sys.argv[2]
         snapshots_path = sys.argv[3]
-        time_tuple = get_time_tuple(sys.argv[4]) if len(sys.argv) > 3 else None
+        time_tuple = get_time_tuple(sys.argv[4]) if len(sys.argv) > 4 else None
+        face_names = sys.argv[5:]
     except:
         print(_USAGE)
         sys.exit(1)
 
-    app.snapshot_all(snapshot_name_postfix, snapshots_path, time_tuple)
+    app.snapshot_all(snapshot_name_postfix, snapshots_path, time_tuple, face_names)
     sys.exit(0)
     
 # Show or take snapshot of a given face
@@ -0,0 +1,58 @@
+# Compile face JSON config to Python module
+
+import json
+import os
+import sys
+
+_USAGE = """
+Usage:
+
+  python3 compile_face.py [face_path] [face_path] ...
+
+    [face_path]     Path of face directory containing "face.json" file
+
+Script writes "face_compiled.py" next to "face.json", containing the same config as Python literal,
+with colors already converted to integers.
+Faces load the compiled module instead of parsing JSON, while it is newer than "face.json".
+On device, convert the module with "mpy-cross" to ".mpy" and delete the ".py" source
+(MicroPython imports ".py" source when both files exist), as importing Python source is not faster than parsing JSON.
+"""
+
+_FACE_FILE = "face.json"
+_COMPILED_FILE = "face_compiled.py"
+
+_HEADER = "# Generated by tools/compile_face.py from face.json, do not edit\n\n"
+
+
+def _color_to_int(value):
+    return int(value.lstrip("#"), 16) if isinstance(value, str) else value
+
+
+def compile_face(face_path):
+    with open(os.path.join(face_path, _FACE_FILE), "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    background = config.get("background", None)
+    if background and "color" in background:
+        background["color"] = _color_to_int(background["color"])
+
+    for label in config.get("labels", []):
+        if "color" in label:
+            label["color"] = _color_to_int(label["color"])
+
+    with open(os.path.join(face_path, _COMPILED_FILE), "w", encoding="utf-8") as f:
+        f.write(_HEADER)
+        f.write(f"CONFIG = {config!r}\n")
+
+
+if __name__ == "__main__":
+    face_paths = sys.argv[1:]
+    if not face_paths:
+        print(_USAGE)
+        sys.exit(1)
+
+    for face_path in face_paths:
+        try:
+            compile_face(face_path)
+        except Exception as e:
+            print(f"Error compiling face: {face_path}", e)
@@ -14,18 +14,24 @@ Usage:
     [height]        Height of image in pixels
 """
 
-try:
-    rawfile = sys.argv[1]
-    imagefile = sys.argv[2]
-    width = int(sys.argv[3])
-    height = int(sys.argv[4])
-except:
-    print(_USAGE)
-    sys.exit(1)
-
-with open(rawfile, "rb") as f:
-    rawData = f.read()
-
-image = Image.frombuffer("RGBA", (width, height), rawData, "raw", "BGRA", 0, 1).convert("RGB")
-image.save(imagefile, quality=90, optimize=True, progressive=False)
-image.close()
+
+def convert_snapshot_to_image(rawfile, imagefile, width, height):
+    with open(rawfile, "rb") as f:
+        rawData = f.read()
+
+    image = Image.frombuffer("RGBA", (width, height), rawData, "raw", "BGRA", 0, 1).convert("RGB")
+    image.save(imagefile, quality=90, optimize=True, progressive=False)
+    image.close()
+
+
+if __name__ == "__main__":
+    try:
+        rawfile = sys.argv[1]
+        imagefile = sys.argv[2]
+        width = int(sys.argv[3])
+        height = int(sys.argv[4])
+    except:
+        print(_USAGE)
+        sys.exit(1)
+
+    convert_snapshot_to_image(rawfile, imagefile, width, height)
@@ -1,64 +1,112 @@
-# Remove unused font files
-
-import os
-import sys
-from pathlib import Path
-
-_USAGE = """
-Usage:
-
-    python3 remove_unused_fonts.py [fonts_path] [search_path]
-
-    [fonts_path]        Path of font files (example: "../fonts")
-    [search_path]       Path to search for files containing font file names (example: "../")
-    [skip_directories]  Comma separated list of directories to skip (relative to "search_path")
-
-Script collects font file names, then searches for them in all ".py" and ".json" files.
-"""
-
-SEARCH_FILE_EXTENSIONS = [".py", ".json"]
-
-try:
-    fonts_dir = sys.argv[1]
-    rootdir = sys.argv[2]
-    skip_directories = list(map(lambda d: os.path.join(rootdir, d), sys.argv[3].split(','))) if len(sys.argv) > 3 else []
-except:
-    print(_USAGE)
-    sys.exit(1)
-
-font_files = [name for name in os.listdir(fonts_dir) if name.endswith(".font")]
-used_font_files = []
-original_font_files_count = len(font_files)
-
-for currentdir, subdirs, files in os.walk(rootdir):
-    # Skip directories we are not interested in
-    if len([1 for skip_dir in skip_directories if skip_dir in currentdir]) > 0:
-        continue
-
-    for file_name in files:
-        # Skip files we are not interested in
-        if len([1 for extension in SEARCH_FILE_EXTENSIONS if file_name.endswith(extension)]) == 0:
-            continue
-
-        try:
-            file_full_path = os.path.join(currentdir, file_name)
-            file_content = Path(file_full_path).read_text()
-
-            # Check for font file usage:
-            used_font_files.extend([font_file for font_file in font_files if font_file in file_content])
-        except Exception:
-            print(f"Problem checking file: {file_full_path}")
-            raise
-
-        # Remove used fonts:
-        for font_file in used_font_files:
-            if font_file in font_files:
-                font_files.remove(font_file)
-
-unused_font_files_count = len(font_files)
-used_font_files_count = len(used_font_files)
-print(f"Font files count: {original_font_files_count}, used: {used_font_files_count}, NOT used: {unused_font_files_count}")
-print("Remove NOT used fonts: ", font_files)
-
-for font_file in font_files:
-    os.remove(os.path.join(fonts_dir, font_file))
+# Remove unused font files
+
+import mmap
+import os
+import re
+import sys
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_USAGE = """
+Usage:
+
+    python3 remove_unused_fonts.py [fonts_path] [search_path]
+
+    [fonts_path]        Path of font files (example: "../fonts")
+    [search_path]       Path to search for files containing font file names (example: "../")
+    [skip_directories]  Comma separated list of directories to skip (relative to "search_path")
+
+Script collects font file names, then searches for them in all ".py" and ".json" files.
+When "pyahocorasick" package is installed, font names are searched with Aho-Corasick automaton,
+otherwise with a regular expression.
+"""
+
+SEARCH_FILE_EXTENSIONS = (".py", ".json")
+MMAP_MIN_FILE_SIZE = 1024 * 1024
+
+try:
+    fonts_dir = sys.argv[1]
+    rootdir = sys.argv[2]
+    skip_directories = list(map(lambda d: os.path.join(rootdir, d), sys.argv[3].split(','))) if len(sys.argv) > 3 else []
+except:
+    print(_USAGE)
+    sys.exit(1)
+
+font_files = {name for name in os.listdir(fonts_dir) if name.endswith(".font")}
+used_font_files = set()
+original_font_files_count = len(font_files)
+if not font_files:
+    print(f"No font files found: {fonts_dir}")
+    sys.exit()
+
+
+def compile_font_matcher(font_files):
+    # Returns function finding font file names used in a file content (bytes),
+    # with a single scan of the content for all of the font file names.
+    if ahocorasick:
+        automaton = ahocorasick.Automaton()
+        for font_file in font_files:
+            automaton.add_word(font_file, font_file)
+        automaton.make_automaton()
+        return lambda content: {font_file for _, font_file in automaton.iter(bytes(content).decode(errors="ignore"))}
+
+    # Pattern works on bytes, so file contents do not have to be decoded.
+    # Matching in a lookahead finds overlapping names too (e.g. a font name inside a longer font name).
+    alternation = b"|".join(re.escape(font_file.encode()) for font_file in sorted(font_files, key=len, reverse=True))
+    pattern = re.compile(b"(?=(" + alternation + b"))")
+    return lambda content: {font_file.decode() for font_file in pattern.findall(content)}
+
+
+def find_files(directory):
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=False):
+            # Skip directories we are not interested in
+            if len([1 for skip_dir in skip_directories if skip_dir in entry.path]) > 0:
+                continue
+            yield from find_files(entry.path)
+        elif entry.is_file() and entry.name.endswith(SEARCH_FILE_EXTENSIONS):
+            yield entry
+
+
+def find_font_files(entry):
+    # Large files are searched through memory map, without copying their content
+    if entry.stat().st_size < MMAP_MIN_FILE_SIZE:
+        with open(entry.path, "rb") as f:
+            return match_font_files(f.read())
+
+    with open(entry.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        return match_font_files(content)
+
+
+# Font files not found in use yet are in "font_files", and only those are searched for
+match_font_files = compile_font_matcher(font_files)
+for entry in find_files(rootdir):
+    # Stop searching when all fonts are used
+    if not font_files:
+        break
+
+    try:
+        # Check for font file usage:
+        found_font_files = find_font_files(entry)
+    except Exception:
+        print(f"Problem checking file: {entry.path}")
+        raise
+
+    if found_font_files:
+        used_font_files |= found_font_files
+        font_files -= found_font_files
+        if font_files:
+            match_font_files = compile_font_matcher(font_files)
+
+font_files = sorted(font_files)
+
+unused_font_files_count = len(font_files)
+used_font_files_count = len(used_font_files)
+print(f"Font files count: {original_font_files_count}, used: {used_font_files_count}, NOT used: {unused_font_files_count}")
+print("Remove NOT used fonts: ", font_files)
+
+for font_file in font_files:
+    os.remove(os.path.join(fonts_dir, font_file))
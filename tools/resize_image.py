@@ -16,15 +16,21 @@ Usage:
 Supported file formats: .png, .jpg, .webp
 """
 
-try:
-    source = sys.argv[1]
-    destination = sys.argv[2]
-    width = int(sys.argv[3])
-    height = int(sys.argv[4])
-except:
-    print(_USAGE)
-    sys.exit(1)
-
-with Image.open(source, mode="r") as image:
-    resized = image.resize((width, height))
-    resized.save(destination, quality=90, optimize=True, progressive=False)
+
+def resize_image(source, destination, width, height):
+    with Image.open(source, mode="r") as image:
+        resized = image.resize((width, height))
+        resized.save(destination, quality=90, optimize=True, progressive=False)
+
+
+if __name__ == "__main__":
+    try:
+        source = sys.argv[1]
+        destination = sys.argv[2]
+        width = int(sys.argv[3])
+        height = int(sys.argv[4])
+    except:
+        print(_USAGE)
+        sys.exit(1)
+
+    resize_image(source, destination, width, height)